@@ -11,6 +11,7 @@
 
 from codekit.codetools import debug, info, warn, error
 from codekit import codetools, eups, pygithub, versiondb
+from concurrent.futures import ThreadPoolExecutor
 import argparse
 import codekit
 import github
@@ -780,15 +781,26 @@ def run():
 
     problems = []
 
-    manifest_products = versiondb.Manifest(
-        manifest,
-        base_url=args.versiondb_base_url).products
+    # the manifest and eups tag files are independent http fetches -- overlap
+    # them instead of paying for each round trip serially
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        manifest_future = executor.submit(
+            lambda: versiondb.Manifest(
+                manifest,
+                base_url=args.versiondb_base_url).products
+        )
+        if not args.manifest_only:
+            eups_future = executor.submit(
+                lambda: eups.EupsTag(
+                    eups_tag,
+                    base_url=args.eupstag_base_url).products
+            )
+
+    manifest_products = manifest_future.result()
 
     if not args.manifest_only:
         # cross-reference eups tag version strings with manifest
-        eups_products = eups.EupsTag(
-            eups_tag,
-            base_url=args.eupstag_base_url).products
+        eups_products = eups_future.result()
 
         # do not fail-fast on non-write operations
         products, err = cross_reference_products(
@@ -4,8 +4,10 @@ from codekit.codetools import debug, error, info, warn
 from codekit import codetools, pygithub
 import argparse
 import codekit.progressbar as pbar
+import collections
 import github
-import re
+import hashlib
+import os
 import sys
 import textwrap
 
@@ -112,6 +114,13 @@ def parse_args():
         '--token',
         default=None,
         help='Literal github personal access token string')
+    parser.add_argument(
+        '--cache-ttl',
+        type=int,
+        default=0,
+        help='Cache repo team membership on disk and reuse it for this many'
+             ' seconds. As membership is used to enforce --deny-team, it is'
+             ' not cached by default (0)')
     parser.add_argument(
         '-d', '--debug',
         action='count',
@@ -135,9 +144,15 @@ def parse_args():
     return parser.parse_args()
 
 
+tag_ref_prefix = 'refs/tags/'
+
+
 def tag_name_from_ref(ref):
     assert isinstance(ref, github.GitRef.GitRef), type(ref)
-    return re.sub(r'^refs/tags/', '', ref.ref)
+    # str.removeprefix() requires python 3.9
+    if ref.ref.startswith(tag_ref_prefix):
+        return ref.ref[len(tag_ref_prefix):]
+    return ref.ref
 
 
 # XXX this should be refactored to operate similar to
@@ -153,13 +168,18 @@ def check_tags(repos, tags, ignore_existing=False, fail_fast=False):
     debug("in {n} repo(s):".format(n=len(repos)))
     [debug("  {r}".format(r=r.full_name)) for r in repos]
 
-    # present/missing tags by repo name
-    present_tags = {}
-    absent_tags = {}
+    # (repo, [tag ref, ...]) of present tags and (repo, [tag name, ...]) of
+    # missing tags
+    present_tags = []
+    absent_tags = []
+
+    # only tag refs sharing the common prefix of all the tags can match, so
+    # there is no need to have github return any others
+    prefix = os.path.commonprefix(tags)
 
     problems = []
     for r in repos:
-        has_tags = find_tags_in_repo(r, tags)
+        has_tags = find_tags_in_repo(r, tags, prefix=prefix)
         if has_tags:
             if not ignore_existing:
                 yikes = GitTagExistsError(
@@ -172,17 +192,11 @@ def check_tags(repos, tags, ignore_existing=False, fail_fast=False):
                 problems.append(yikes)
                 error(yikes)
 
-            present_tags[r.full_name] = {
-                'repo': r,
-                'tags': list(has_tags.values()),
-            }
+            present_tags.append((r, list(has_tags.values())))
 
         missing_tags = [x for x in tags if x not in has_tags]
         if missing_tags:
-            absent_tags[r.full_name] = {
-                'repo': r,
-                'need_tags': missing_tags,
-            }
+            absent_tags.append((r, missing_tags))
 
     debug(textwrap.dedent("""\
         found:
@@ -198,7 +212,7 @@ def check_tags(repos, tags, ignore_existing=False, fail_fast=False):
     return present_tags, absent_tags, problems
 
 
-def find_tags_in_repo(repo, tags):
+def find_tags_in_repo(repo, tags, prefix=''):
     assert isinstance(repo, github.Repository.Repository), type(repo)
 
     debug(textwrap.dedent("""\
@@ -209,13 +223,22 @@ def find_tags_in_repo(repo, tags):
         tags=tags,
     ))
 
+    # list all of the tags at once instead of probing for each one
+    try:
+        refs = {tag_name_from_ref(r): r
+                for r in pygithub.get_tag_refs(repo, prefix=prefix)}
+    except github.RateLimitExceededException:
+        raise
+    except github.GithubException as e:
+        msg = 'error getting tags'
+        raise pygithub.CaughtRepositoryError(repo, e, msg) from None
+
     found_tags = {}
     for t in tags:
-        ref = pygithub.find_tag_by_name(repo, t)
-        if ref and ref.ref:
+        ref = refs.get(t)
+        if ref:
             debug("  found: {tag} ({ref})".format(tag=t, ref=ref.ref))
-            name = tag_name_from_ref(ref)
-            found_tags[name] = ref
+            found_tags[t] = ref
             continue
 
         debug("  not found: {tag}".format(tag=t))
@@ -223,26 +246,30 @@ def find_tags_in_repo(repo, tags):
     return found_tags
 
 
-cached_teams = {}
+# configured by run() -- repo team membership is cached across invocations
+teams_cache = None
 
 
 def find_repo_teams(repo):
-    # Repository objects are unhashable, so we can't use memoization ;(
-    if repo.full_name in cached_teams:
-        return cached_teams[repo.full_name]
+    """Return the names of the teams which repo is a member of."""
+    # Repository objects are unhashable, so the cache is keyed by repo name
+    if teams_cache:
+        team_names = teams_cache.get(repo.full_name)
+        if team_names is not None:
+            return team_names
 
     try:
-        # flatten iterator so the results are cached
-        teams = list(repo.get_teams())
+        team_names = [t.name for t in repo.get_teams()]
     except github.RateLimitExceededException:
         raise
     except github.GithubException as e:
         msg = 'error getting teams'
         raise pygithub.CaughtRepositoryError(repo, e, msg) from None
 
-    cached_teams[repo.full_name] = teams
+    if teams_cache:
+        teams_cache.set(repo.full_name, team_names)
 
-    return teams
+    return team_names
 
 
 def get_candidate_teams(org, target_teams):
@@ -266,31 +293,51 @@ def get_candidate_teams(org, target_teams):
     return tag_teams
 
 
+def select_candidate_repos(team_repos):
+    """Return the unique repos from (team, [repo, ...]) pairs along with a
+    mapping of repo full_name to the names of the teams which selected it."""
+    repos = []
+    # names of the teams which were used to select each repo as a candidate
+    # for tagging -- this is a by-product of walking the team repo lists and
+    # saves requesting the teams of every repo
+    selected_by = collections.defaultdict(list)
+    for t, t_repos in team_repos:
+        for r in t_repos:
+            # a repo may belong to several of the selected teams but must only
+            # be checked and tagged once
+            if r.full_name not in selected_by:
+                repos.append(r)
+            selected_by[r.full_name].append(t.name)
+
+    return repos, selected_by
+
+
 def get_candidate_repos(teams):
-    # flatten generator to list so it can be itererated over multiple times
-    repos = list(pygithub.get_repos_by_team(teams))
+    repos, selected_by = select_candidate_repos(
+        pygithub.get_team_repos(teams)
+    )
 
     # find length of longest repo name to nicely format output
-    names = [r.full_name for r in repos]
-    max_name_len = len(max(names, key=len))
+    max_name_len = max((len(r.full_name) for r in repos), default=0)
 
-    team_names = [t.name for t in teams]
     info("found {n} repo(s) [selected by team(s)]:".format(n=len(repos)))
     for r in repos:
-        # list only teams which were used to select the repo as a candiate
-        # for tagging
-        s_teams = [t.name for t in find_repo_teams(r)
-                   if t.name in team_names]
         info("  {repo: >{w}} {teams}".format(
             w=max_name_len,
             repo=r.full_name,
-            teams=s_teams)
+            teams=selected_by[r.full_name])
         )
 
     return repos
 
 
 def check_repos(repos, allow_teams, deny_teams, fail_fast=False):
+    # the candidate repos were selected by membership in the allowed teams, so
+    # only a deny list requires fetching the full set of teams for each repo
+    if not deny_teams:
+        debug('no teams denied -- skipping repo team membership check')
+        return []
+
     problems = []
     for r in repos:
         try:
@@ -298,7 +345,7 @@ def check_repos(repos, allow_teams, deny_teams, fail_fast=False):
                 r,
                 allow_teams=allow_teams,
                 deny_teams=deny_teams,
-                team_names=[t.name for t in find_repo_teams(r)],
+                team_names=find_repo_teams(r),
             )
         except pygithub.RepositoryTeamMembershipError as e:
             if fail_fast:
@@ -318,17 +365,17 @@ def tag_repos(absent_tags, **kwargs):
 
     info("tagging {n} repo(s) [tags]:".format(n=len(absent_tags)))
 
-    max_name_len = len(max(absent_tags, key=len))
-    for k in absent_tags:
+    max_name_len = max((len(r.full_name) for r, _ in absent_tags), default=0)
+    for r, tags in absent_tags:
         info("  {repo: >{w}} {tags}".format(
             w=max_name_len,
-            repo=k,
-            tags=absent_tags[k]['need_tags']
+            repo=r.full_name,
+            tags=tags
         ))
 
-    for k in absent_tags:
-        r = absent_tags[k]['repo']
-        tags = absent_tags[k]['need_tags']
+    # repos are tagged serially -- pygithub's Requester is shared by all
+    # repo objects and is not thread-safe
+    for r, tags in absent_tags:
         create_tags(r, tags, **kwargs)
 
 
@@ -357,7 +404,7 @@ def create_tags(repo, tags, tagger, dry_run=False):
             debug('    (noop)')
             continue
 
-        tag_obj = repo.create_git_tag(
+        tag_obj = pygithub.retry_ratelimit(repo.create_git_tag)(
             t,
             "Version {t}".format(t=t),  # fmt similar to github-tag-release
             head.object.sha,
@@ -366,7 +413,10 @@ def create_tags(repo, tags, tagger, dry_run=False):
         )
         debug("  created tag object {tag_obj}".format(tag_obj=tag_obj))
 
-        ref = repo.create_git_ref("refs/tags/{t}".format(t=t), tag_obj.sha)
+        ref = pygithub.retry_ratelimit(repo.create_git_ref)(
+            "refs/tags/{t}".format(t=t),
+            tag_obj.sha
+        )
         debug("  created ref: {ref}".format(ref=ref.ref))
 
 
@@ -380,18 +430,16 @@ def untag_repos(present_tags, **kwargs):
 
     info("untagging {n} repo(s) [tags]:".format(n=len(present_tags)))
 
-    max_name_len = len(max(present_tags, key=len))
-    for k in present_tags:
+    max_name_len = max((len(r.full_name) for r, _ in present_tags), default=0)
+    for r, refs in present_tags:
         info("  {repo: >{w}} {tags}".format(
             w=max_name_len,
-            repo=k,
-            tags=[tag_name_from_ref(ref) for ref in present_tags[k]['tags']]
+            repo=r.full_name,
+            tags=[tag_name_from_ref(ref) for ref in refs]
         ))
 
-    for k in present_tags:
-        r = present_tags[k]['repo']
-        tags = present_tags[k]['tags']
-        delete_refs(r, tags, **kwargs)
+    for r, refs in present_tags:
+        delete_refs(r, refs, **kwargs)
 
 
 def delete_refs(repo, refs, dry_run=False):
@@ -432,11 +480,28 @@ def run():
     )
     debug(tagger)
 
+    token = codetools.github_token(
+        token_path=args.token_path,
+        token=args.token,
+    )
+
     global g
-    g = pygithub.login_github(token_path=args.token_path, token=args.token)
+    g = pygithub.login_github(token=token)
     org = g.get_organization(gh_org_name)
     info("tagging repos in org: {org}".format(org=org.login))
 
+    # team membership is used to enforce --deny-team, so it is only cached
+    # when explicitly requested
+    if args.cache_ttl > 0:
+        global teams_cache
+        # team visibility depends on the token, so entries fetched with a
+        # different token are not reused
+        teams_cache = codetools.FileCache(
+            'teams',
+            ttl=args.cache_ttl,
+            meta={'token': hashlib.sha256(token.encode('utf-8')).hexdigest()},
+        )
+
     tag_teams = get_candidate_teams(org, args.allow_team)
     target_repos = get_candidate_repos(tag_teams)
 
@@ -4,16 +4,16 @@
 # - package
 
 
-from datetime import datetime
-from pkg_resources import get_distribution
+from datetime import datetime, timezone
 from public import public
 import argparse
-import gitconfig
+import functools
+import hashlib
+import json
 import os
-import shutil
 import sys
-import tempfile
 import textwrap
+import time
 
 # configured by setup_logging() -- this is declared only as a friendly reminder
 # that something unusual is going on this with this var.
@@ -91,6 +91,21 @@ def setup_logging(verbosity=0):
         for f in logging_funcs]
 
 
+@functools.lru_cache(maxsize=1)
+def _dist_version():
+    """Return the installed version of the sqre-codekit distribution."""
+    # importing pkg_resources is slow as it scans all of sys.path, so prefer
+    # importlib.metadata when it is available
+    try:
+        from importlib.metadata import version
+    except ImportError:
+        # python < 3.8
+        from pkg_resources import get_distribution
+        return get_distribution('sqre-codekit').version
+
+    return version('sqre-codekit')
+
+
 # based on _VersionAction() from:
 # https://github.com/python/cpython/blob/3.6/Lib/argparse.py
 class ScmVersionAction(argparse.Action):
@@ -111,7 +126,7 @@ class ScmVersionAction(argparse.Action):
         self.version = version
 
     def __call__(self, parser, namespace, values, option_string=None):
-        version = get_distribution('sqre-codekit').version
+        version = _dist_version()
         formatter = parser._get_formatter()
         formatter.add_text("%(prog)s {v}".format(v=version))
         parser._print_message(formatter.format_help(), sys.stdout)
@@ -223,14 +238,21 @@ def github_token(token_path=None, token=None):
     return token
 
 
+@functools.lru_cache(maxsize=1)
+def _gitconfig():
+    """Return the parsed user .gitconfig, which is read from disk only once.
+    """
+    import gitconfig
+    return gitconfig.GitConfig()
+
+
 @public
 def gitusername():
     """
     Returns the user's name from .gitconfig if available
     """
     try:
-        mygitconfig = gitconfig.GitConfig()
-        return mygitconfig['user.name']
+        return _gitconfig()['user.name']
     except:
         return None
 
@@ -242,8 +264,7 @@ def gituseremail():
     """
 
     try:
-        mygitconfig = gitconfig.GitConfig()
-        return mygitconfig['user.email']
+        return _gitconfig()['user.email']
     except:
         return None
 
@@ -298,6 +319,7 @@ class TempDir(object):
     """
 
     def __init__(self):
+        import tempfile
         super(TempDir, self).__init__()
         self._temp_dir = tempfile.mkdtemp()
 
@@ -305,15 +327,228 @@ class TempDir(object):
         return self._temp_dir
 
     def __exit__(self, ttype, value, traceback):
+        import shutil
         shutil.rmtree(self._temp_dir)
         self._temp_dir = None
 
 
+@public
+def cache_dir():
+    """Return the path to the codekit on-disk cache directory.
+
+    This is `$XDG_CACHE_HOME/codekit`, if `XDG_CACHE_HOME` is set, otherwise
+    `~/.cache/codekit`.
+    """
+    base = os.environ.get('XDG_CACHE_HOME')
+    if not base:
+        base = os.path.join(os.path.expanduser('~'), '.cache')
+
+    return os.path.join(base, 'codekit')
+
+
+@public
+class FileCache(object):
+    """Persistent key/value store of json serializable values.
+
+    Each entry is written to a separate file under `<cache_dir()>/<name>/`
+    along with the time it was stored and any metadata.  Entries are also
+    memoized in memory for the life of the object.  The on-disk cache is best
+    effort -- an entry which can not be read is treated as a miss and a
+    failure to write an entry is ignored.
+
+    For example::
+
+        cache = FileCache('example', ttl=3600)
+        cache.set('foo', ['bar', 'baz'])
+        assert cache.get('foo') == ['bar', 'baz']
+
+    Parameters
+    ----------
+    name: str
+        Name of the cache. Eg., `teams`
+
+    ttl: int, optional
+        Age, in seconds, after which an on-disk entry is considered stale.
+        Entries never expire if `None`.
+
+    meta: dict, optional
+        Metadata which must match the metadata stored with an on-disk entry
+        for it to be considered valid. Eg., a hash of the credentials used to
+        retrieve the value.
+    """
+
+    def __init__(self, name, ttl=None, meta=None):
+        self.path = os.path.join(cache_dir(), name)
+        self.ttl = ttl
+        self.meta = meta or {}
+        self._entries = {}
+
+    def _entry_path(self, key):
+        digest = hashlib.sha256(key.encode('utf-8')).hexdigest()
+        return os.path.join(self.path, digest + '.json')
+
+    def _load_entry(self, key):
+        try:
+            with open(self._entry_path(key), 'r') as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):
+            return None
+
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+
+        meta = entry.get('meta', {})
+        if any(meta.get(k) != v for k, v in self.meta.items()):
+            debug("cache entry {key} has stale metadata".format(key=key))
+            return None
+
+        if self.ttl is not None:
+            age = time.time() - entry.get('timestamp', 0)
+            if age >= self.ttl:
+                debug("cache entry {key} has expired".format(key=key))
+                return None
+
+        return entry
+
+    def get_entry(self, key):
+        """Return the entry for `key` or `None` if it is missing or invalid.
+
+        An entry is a `dict` with the keys `key`, `value`, `timestamp`, and
+        `meta`.
+        """
+        try:
+            return self._entries[key]
+        except KeyError:
+            pass
+
+        entry = self._load_entry(key)
+        if entry is not None:
+            self._entries[key] = entry
+
+        return entry
+
+    def get(self, key, default=None):
+        """Return the value stored for `key` or `default`."""
+        entry = self.get_entry(key)
+        if entry is None:
+            return default
+
+        return entry['value']
+
+    def set(self, key, value, **meta):
+        """Store `value` for `key`.  Any keyword arguments are recorded as
+        metadata in addition to the metadata the cache was created with."""
+        entry = {
+            'key': key,
+            'value': value,
+            'timestamp': time.time(),
+            'meta': dict(self.meta, **meta),
+        }
+        self._entries[key] = entry
+
+        import tempfile
+        tmp = None
+        try:
+            os.makedirs(self.path, exist_ok=True)
+            # write + rename so that a reader never sees a partial entry
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'w') as fh:
+                json.dump(entry, fh)
+            os.replace(tmp, self._entry_path(key))
+        except OSError as e:
+            debug("unable to write cache entry {key}: {e}".format(
+                key=key,
+                e=e,
+            ))
+            if tmp and os.path.exists(tmp):
+                os.remove(tmp)
+
+
+@functools.lru_cache(maxsize=1)
+def http_session():
+    """Return a `requests.Session` shared by all codekit http fetches so that
+    connections are kept alive and reused between requests."""
+    import requests
+    from requests.adapters import HTTPAdapter
+    from urllib3.util.retry import Retry
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=10,
+        pool_maxsize=10,
+        # retry connection errors and transient gateway errors
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.3,
+            status_forcelist=[502, 503, 504],
+            # return the final response so that the caller's
+            # raise_for_status() raises an HTTPError, not a RetryError
+            raise_on_status=False,
+        ),
+    )
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    return session
+
+
+@public
+def fetch_url(url, cache=None):
+    """Fetch a url and return the response body as text.
+
+    Parameters
+    ----------
+    url: str
+        url to fetch
+
+    cache: FileCache, optional
+        If specified, the response body is stored along with its `ETag` and/or
+        `Last-Modified` headers. Subsequent fetches of the same url are made
+        as conditional requests and a `304 Not Modified` response is served
+        from the cache.
+
+    Returns
+    -------
+    text : `string`
+
+    Raises
+    ------
+    requests.HTTPError
+        Upon an http error status
+    """
+    headers = {}
+    entry = cache.get_entry(url) if cache else None
+    if entry:
+        if entry['meta'].get('etag'):
+            headers['If-None-Match'] = entry['meta']['etag']
+        if entry['meta'].get('last_modified'):
+            headers['If-Modified-Since'] = entry['meta']['last_modified']
+
+    debug("fetching: {url}".format(url=url))
+    # without a timeout a stalled connection would hang forever
+    r = http_session().get(url, headers=headers, timeout=30)
+
+    if entry and r.status_code == 304:
+        debug("  not modified -- using cached copy")
+        return entry['value']
+
+    r.raise_for_status()
+
+    if cache:
+        etag = r.headers.get('ETag')
+        last_modified = r.headers.get('Last-Modified')
+        # without a validator the response can not be revalidated
+        if etag or last_modified:
+            cache.set(url, r.text, etag=etag, last_modified=last_modified)
+
+    return r.text
+
+
 @public
 def current_timestamp():
     """Returns current time as ISO8601 formatted string in the Zulu TZ"""
-    now = datetime.utcnow()
-    timestamp = now.isoformat()[0:19] + 'Z'
+    # datetime.utcnow() is deprecated as of python 3.12
+    timestamp = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
 
     debug("generated timestamp: {now}".format(now=timestamp))
 
@@ -1,10 +1,9 @@
 """EUPS distrib tag related utility functions."""
 
-from codekit.codetools import debug
 from public import public
+import codekit.codetools as codetools
 import logging
 import re
-import requests
 import textwrap
 
 default_pkgroot = 'https://eups.lsst.codes/stack/src'
@@ -48,12 +47,13 @@ class EupsTag(object):
     def __fetch_tag_file(self):
         # construct url
         tag_url = '/'.join((self.base_url, self.name + '.list'))
-        debug("fetching: {url}".format(url=tag_url))
 
-        r = requests.get(tag_url)
-        r.raise_for_status()
-
-        self.__text = r.text
+        # tag files may be republished under the same name, so each fetch is
+        # revalidated rather than using the cached copy outright
+        self.__text = codetools.fetch_url(
+            tag_url,
+            cache=codetools.FileCache('eups-tags'),
+        )
 
     def __parse_tag_text(self):
         products = {}
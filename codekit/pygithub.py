@@ -2,14 +2,17 @@
 pygithub based help functions for interacting with the github api.
 """
 
-from codekit.codetools import debug
+from codekit.codetools import debug, warn
 from github import Github
 from public import public
 import codekit.codetools as codetools
 import collections
+import functools
 import github
 import itertools
+import random
 import textwrap
+import time
 
 github.MainClass.DEFAULT_TIMEOUT = 15  # timeouts creating teams w/ many repos
 
@@ -175,11 +178,59 @@ def login_github(token_path=None, token=None):
     """
 
     token = codetools.github_token(token_path=token_path, token=token)
-    g = Github(token)
+
+    # 100 is the max page size allowed by the github api -- the default of 30
+    # results in ~3x as many requests when walking paginated lists
+    g = Github(token, per_page=100)
+    debug("github per_page: {n}".format(n=g.per_page))
     debug_ratelimit(g)
     return g
 
 
+@public
+def retry_ratelimit(func, retries=5, backoff=1.0):
+    """Wrap a callable so that it is retried, with exponential backoff and
+    jitter, when the github ratelimit has been exceeded.
+
+    Parameters
+    ----------
+    func: callable
+        Function or method making a github api request.
+
+    retries: int, optional
+        Number of times to retry before giving up. Defaults to 5.
+
+    backoff: float, optional
+        Initial delay, in seconds, which is doubled after each attempt.
+
+    Returns
+    -------
+    wrapper : callable
+        Accepts the same arguments as `func`.
+
+    Raises
+    ------
+    github.RateLimitExceededException
+        If the ratelimit is still exceeded after all retries.
+    """
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        for attempt in range(retries + 1):
+            try:
+                return func(*args, **kwargs)
+            except github.RateLimitExceededException:
+                if attempt == retries:
+                    raise
+
+                delay = backoff * 2 ** attempt + random.uniform(0, backoff)
+                warn("github ratelimit exceeded -- retry in {d:.1f}s".format(
+                    d=delay,
+                ))
+                time.sleep(delay)
+
+    return wrapper
+
+
 @public
 def find_tag_by_name(repo, tag_name, safe=True):
     """Find tag by name in a github Repository
@@ -217,6 +268,41 @@ def find_tag_by_name(repo, tag_name, safe=True):
     return None
 
 
+@public
+def get_tag_refs(repo, prefix=''):
+    """Find all tag refs in a github Repository with a single (paginated)
+    api request.
+
+    Parameters
+    ----------
+    repo: :class:`github.Repository` instance
+
+    prefix: str, optional
+        Only tags with names beginning with this string are returned.
+
+    Returns
+    -------
+    iterator of github.GitRef.GitRef objects
+
+    Raises
+    ------
+    github.GithubException
+        Upon error from github api
+    """
+    matching_ref = 'tags/{prefix}'.format(prefix=prefix)
+
+    if hasattr(repo, 'get_git_matching_refs'):
+        return repo.get_git_matching_refs(matching_ref)
+
+    # older pygithub releases do not wrap the matching-refs endpoint
+    return github.PaginatedList.PaginatedList(
+        github.GitRef.GitRef,
+        repo._requester,
+        "{url}/git/matching-refs/{ref}".format(url=repo.url, ref=matching_ref),
+        None,
+    )
+
+
 @public
 def get_repos_by_team(teams):
     """Find repos by membership in github team(s).
@@ -240,6 +326,30 @@ def get_repos_by_team(teams):
     )
 
 
+@public
+def get_team_repos(teams):
+    """Find the repos belonging to each github team.
+
+    Parameters
+    ----------
+    teams: list(github.Team.Team)
+        list of Team objects
+
+    Returns
+    -------
+    list of (github.Team.Team, list(github.Repository.Repository)) tuples
+        in the same order as `teams`
+
+    Raises
+    ------
+    github.GithubException
+        Upon error from github api
+    """
+    # unlike get_repos_by_team(), this fetches every page up front. The
+    # teams are walked serially as pygithub's Requester is not thread-safe.
+    return [(t, list(t.get_repos())) for t in teams]
+
+
 @public
 def get_teams_by_name(org, team_names):
     """Find team(s) in org by name(s).
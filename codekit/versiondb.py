@@ -2,14 +2,21 @@
 
 from codekit.codetools import debug
 from public import public
+import codekit.codetools as codetools
 import logging
 import re
-import requests
 import textwrap
 
 default_base_url =\
     'https://raw.githubusercontent.com/lsst/versiondb/master/manifests'
 
+# version of the parsed products format stored in the on-disk cache -- this
+# must be incremented whenever the output of Manifest.__parse_manifest_text()
+# changes so that stale entries are discarded
+manifest_cache_version = 1
+
+build_line_re = re.compile(r'^BUILD=(b\d{4})$')
+
 
 @public
 def setup_logging(verbosity=0):
@@ -48,29 +55,23 @@ class Manifest(object):
         if base_url:
             self.base_url = base_url
 
-    def __fetch_manifest_file(self):
-        # construct url
-        tag_url = '/'.join((self.base_url, self.name + '.txt'))
-        debug("fetching: {url}".format(url=tag_url))
-
-        r = requests.get(tag_url)
-        r.raise_for_status()
+    def __manifest_url(self):
+        return '/'.join((self.base_url, self.name + '.txt'))
 
-        self.__text = r.text
+    def __fetch_manifest_file(self):
+        self.__text = codetools.fetch_url(self.__manifest_url())
 
     def __parse_manifest_text(self):
         products = {}
 
+        parsed_name = None
+        # r.text is always a str so there is no need to decode each line
         for n, line in enumerate(self.__text.splitlines(), start=1):
-            if not isinstance(line, str):
-                line = str(line, 'utf-8')
-
             # skip commented out and blank lines
-            if line.startswith('#') or line == '':
+            if not line or line[0] == '#':
                 continue
             if line.startswith('BUILD'):
-                pat = r'^BUILD=(b\d{4})$'
-                m = re.match(pat, line)
+                m = build_line_re.match(line)
                 if not m:
                     raise RuntimeError(textwrap.dedent("""
                         Unparsable versiondb manifest:
@@ -82,8 +83,9 @@ class Manifest(object):
                 continue
 
             try:
-                # min of 3, max of 4 fields
-                fields = line.split()[0:4]
+                # min of 3, max of 4 fields -- stop splitting once the 4th
+                # field has been found
+                fields = line.split(None, 4)[0:4]
                 (name, sha, eups_version) = fields[0:3]
             except ValueError as e:
                 raise ValueError(
@@ -93,18 +95,16 @@ class Manifest(object):
                         e=e,
                     )) from None
 
+            # the 4th field, if present, is a csv list of deps
+            dependencies = fields[3].split(',') if len(fields) == 4 else []
+
             products[name] = {
                 'name': name,
                 'sha': sha,
                 'eups_version': eups_version,
-                'dependencies': [],
+                'dependencies': dependencies,
             }
 
-            # the 4th field, if present, is a csv list of deps
-            if len(fields) == 4:
-                dependencies = fields[3:4][0].split(',')
-                products[name]['dependencies'] = dependencies
-
         # sanity check tag name in the file
         if not self.name == parsed_name:
             raise RuntimeError(textwrap.dedent("""
@@ -118,9 +118,31 @@ class Manifest(object):
         self.__products = products
 
     def __process(self):
+        # manifests published to the default versiondb are immutable, so the
+        # parsed products are cached on disk without an expiration. Files
+        # under any other base url could change and are always fetched.
+        if self.base_url != default_base_url:
+            self.__fetch_manifest_file()
+            self.__parse_manifest_text()
+            return
+
+        cache = codetools.FileCache(
+            'manifests',
+            meta={'version': manifest_cache_version},
+        )
+        url = self.__manifest_url()
+
+        products = cache.get(url)
+        if products is not None:
+            debug("using cached manifest: {url}".format(url=url))
+            self.__products = products
+            return
+
         self.__fetch_manifest_file()
         self.__parse_manifest_text()
 
+        cache.set(url, self.__products, name=self.name)
+
     @property
     def products(self):
         """Return Dict of products described by the manifest"""
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+
+import codekit.cli.github_tag_teams as tag_teams
+import codekit.pygithub
+import github
+import pytest
+
+
+class StubRepo(github.Repository.Repository):
+    """Passes isinstance() checks without talking to the github api"""
+    def __init__(self, full_name, tags=(), error=None):
+        self._stub_full_name = full_name
+        self._stub_tags = tags
+        self._stub_error = error
+        self.get_teams_calls = 0
+        self.matching_refs = []
+
+    @property
+    def full_name(self):
+        return self._stub_full_name
+
+    def get_teams(self):
+        self.get_teams_calls += 1
+        return []
+
+    def get_git_matching_refs(self, ref):
+        self.matching_refs.append(ref)
+        if self._stub_error:
+            raise self._stub_error
+        prefix = ref[len('tags/'):]
+        return [StubRef('refs/tags/' + t) for t in self._stub_tags
+                if t.startswith(prefix)]
+
+
+class StubRef(github.GitRef.GitRef):
+    def __init__(self, ref):
+        self._stub_ref = ref
+
+    @property
+    def ref(self):
+        return self._stub_ref
+
+
+class StubTeam(object):
+    def __init__(self, name, repos):
+        self.name = name
+        self.repos = repos
+
+    def get_repos(self):
+        return iter(self.repos)
+
+
+@pytest.fixture
+def repos():
+    return {n: StubRepo(n) for n in ('lsst/foo', 'lsst/bar', 'lsst/baz')}
+
+
+@pytest.fixture
+def teams(repos):
+    return [
+        StubTeam('DM Auxilliaries', [repos['lsst/foo'], repos['lsst/bar']]),
+        StubTeam('DM Externals', [repos['lsst/bar'], repos['lsst/baz']]),
+    ]
+
+
+def test_select_candidate_repos(teams, repos):
+    """A repo in several selected teams is a candidate only once"""
+    candidates, selected_by = tag_teams.select_candidate_repos(
+        [(t, t.repos) for t in teams]
+    )
+
+    assert [r.full_name for r in candidates] == \
+        ['lsst/foo', 'lsst/bar', 'lsst/baz']
+    assert selected_by['lsst/foo'] == ['DM Auxilliaries']
+    assert selected_by['lsst/bar'] == ['DM Auxilliaries', 'DM Externals']
+    assert selected_by['lsst/baz'] == ['DM Externals']
+
+
+def test_get_candidate_repos(teams):
+    """Candidate repos are unique and in team order"""
+    candidates = tag_teams.get_candidate_repos(teams)
+
+    assert [r.full_name for r in candidates] == \
+        ['lsst/foo', 'lsst/bar', 'lsst/baz']
+
+
+def test_check_repos_no_deny_teams(repos):
+    """Team membership is not fetched when no teams are denied"""
+    problems = tag_teams.check_repos(
+        list(repos.values()),
+        allow_teams=['DM Auxilliaries'],
+        deny_teams=None,
+    )
+
+    assert problems == []
+    assert all(r.get_teams_calls == 0 for r in repos.values())
+
+
+def test_find_tags_in_repo():
+    """Tags are found with a single matching-refs listing"""
+    repo = StubRepo('lsst/foo', tags=['w.2018.40', 'w.2018.41', 'v15.0'])
+
+    found = tag_teams.find_tags_in_repo(repo, ['w.2018.41', 'w.2018.42'])
+
+    assert repo.matching_refs == ['tags/']
+    assert list(found.keys()) == ['w.2018.41']
+    assert found['w.2018.41'].ref == 'refs/tags/w.2018.41'
+
+
+def test_find_tags_in_repo_prefix():
+    """The prefix is passed through to matching-refs"""
+    repo = StubRepo('lsst/foo', tags=['w.2018.40', 'w.2018.41'])
+
+    found = tag_teams.find_tags_in_repo(repo, ['w.2018.40'], prefix='w.2018.4')
+
+    assert repo.matching_refs == ['tags/w.2018.4']
+    assert list(found.keys()) == ['w.2018.40']
+
+
+def test_find_tags_in_repo_error():
+    """github api errors are wrapped with the repo"""
+    repo = StubRepo(
+        'lsst/foo',
+        error=github.GithubException(409, {'message': 'Repository is empty'}),
+    )
+
+    with pytest.raises(codekit.pygithub.CaughtRepositoryError) as e:
+        tag_teams.find_tags_in_repo(repo, ['w.2018.40'])
+    assert e.value.repo is repo
+
+
+@pytest.mark.parametrize('tags,prefix,foo_present,foo_absent', [
+    # tags sharing a stem
+    (['w.2018.40', 'w.2018.41'], 'w.2018.4', ['w.2018.40'], ['w.2018.41']),
+    # a single tag is its own prefix
+    (['w.2018.40'], 'w.2018.40', ['w.2018.40'], []),
+    # no common prefix lists every tag
+    (['w.2018.41', 'v15.0'], '', ['v15.0'], ['w.2018.41']),
+])
+def test_check_tags_prefix(tags, prefix, foo_present, foo_absent):
+    """check_tags() passes the common prefix of the tags to matching-refs"""
+    foo = StubRepo('lsst/foo', tags=['w.2018.40', 'v15.0'])
+    bar = StubRepo('lsst/bar')
+
+    present, absent, problems = tag_teams.check_tags(
+        [foo, bar],
+        tags,
+        ignore_existing=True,
+    )
+
+    assert foo.matching_refs == ['tags/' + prefix]
+    assert bar.matching_refs == ['tags/' + prefix]
+    assert problems == []
+
+    assert [(r.full_name, [tag_teams.tag_name_from_ref(ref) for ref in refs])
+            for r, refs in present] == [('lsst/foo', foo_present)]
+
+    expected_absent = [('lsst/bar', tags)]
+    if foo_absent:
+        expected_absent.insert(0, ('lsst/foo', foo_absent))
+    assert [(r.full_name, t) for r, t in absent] == expected_absent
@@ -0,0 +1,7 @@
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """Keep codetools.FileCache from writing to the real ~/.cache"""
+    monkeypatch.setenv('XDG_CACHE_HOME', str(tmp_path))
@@ -84,3 +84,29 @@ def test_d_2018_05_08(d_2018_05_08):
     assert products['skymap']['name'] == 'skymap'
     assert products['skymap']['flavor'] == 'generic'
     assert products['skymap']['eups_version'] == '15.0-4-g5589a47+3'
+
+
+@responses.activate
+def test_not_modified(v15_0):
+    url = 'https://eups.lsst.codes/stack/src/tags/v15_0.list'
+    responses.add(
+        responses.Response(
+            method='GET',
+            url=url,
+            body=v15_0,
+            headers={'ETag': '"foo"'},
+        ),
+    )
+    responses.add(
+        responses.Response(
+            method='GET',
+            url=url,
+            status=304,
+        ),
+    )
+    products = eups.EupsTag(name='v15_0').products
+
+    # the second fetch should be a conditional request served from the cache
+    assert eups.EupsTag(name='v15_0').products == products
+    assert len(responses.calls) == 2
+    assert responses.calls[1].request.headers['If-None-Match'] == '"foo"'
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+
+import codekit.pygithub
+import github
+import pytest
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Record backoff delays instead of sleeping"""
+    delays = []
+    monkeypatch.setattr(codekit.pygithub.time, 'sleep', delays.append)
+    return delays
+
+
+def ratelimited(n):
+    """Return a callable that exceeds the ratelimit n times before
+    succeeding"""
+    calls = []
+
+    def func(*args, **kwargs):
+        calls.append((args, kwargs))
+        if len(calls) <= n:
+            raise github.RateLimitExceededException(403, {})
+        return 'ok'
+
+    func.calls = calls
+    return func
+
+
+def test_retry(sleeps):
+    """Retried until the call succeeds, with increasing delays"""
+    func = ratelimited(3)
+    wrapped = codekit.pygithub.retry_ratelimit(func, retries=5, backoff=1.0)
+
+    assert wrapped('foo', bar='baz') == 'ok'
+    assert len(func.calls) == 4
+    assert func.calls[0] == (('foo',), {'bar': 'baz'})
+
+    # exponential backoff of 1, 2, 4s plus up to 1s of jitter
+    assert len(sleeps) == 3
+    for n, delay in enumerate(sleeps):
+        assert 2 ** n <= delay <= 2 ** n + 1
+
+
+def test_retry_exhausted(sleeps):
+    """The exception is re-raised once all retries are used up"""
+    func = ratelimited(10)
+    wrapped = codekit.pygithub.retry_ratelimit(func, retries=2)
+
+    with pytest.raises(github.RateLimitExceededException):
+        wrapped()
+    assert len(func.calls) == 3
+    assert len(sleeps) == 2
+
+
+def test_no_retry_on_other_errors(sleeps):
+    """Other github errors are not retried"""
+    def func():
+        raise github.GithubException(500, {})
+
+    with pytest.raises(github.GithubException):
+        codekit.pygithub.retry_ratelimit(func)()
+    assert sleeps == []
@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+import codekit.pygithub
+
+
+class StubRequester(object):
+    """Records requests made by a github.PaginatedList"""
+    per_page = 100
+    is_not_lazy = False
+
+    def __init__(self):
+        self.urls = []
+
+    def requestJsonAndCheck(self, verb, url, *args, **kwargs):
+        self.urls.append((verb, url))
+        return {}, []
+
+
+class StubRepo(object):
+    """A repo from a pygithub release without get_git_matching_refs()"""
+    url = 'https://api.github.com/repos/lsst/foo'
+
+    def __init__(self):
+        self._requester = StubRequester()
+
+
+def test_get_tag_refs_fallback():
+    """The matching-refs endpoint is used without pygithub support"""
+    repo = StubRepo()
+
+    assert list(codekit.pygithub.get_tag_refs(repo, prefix='w.2018.')) == []
+    assert repo._requester.urls == [(
+        'GET',
+        'https://api.github.com/repos/lsst/foo/git/matching-refs/tags/w.2018.',
+    )]
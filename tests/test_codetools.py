@@ -3,6 +3,7 @@
 import os
 import codekit.codetools as codetools
 import pytest
+import re
 
 
 def test_tempdir():
@@ -12,6 +13,29 @@ def test_tempdir():
     assert os.path.exists(temp_dir) is False
 
 
+def test_file_cache():
+    """Test persistent cache round trip, expiration, and metadata checks"""
+    cache = codetools.FileCache('test', meta={'token': 'foo'})
+    assert cache.get('bar') is None
+    cache.set('bar', ['baz'], url='http://example.org')
+    assert cache.get('bar') == ['baz']
+
+    # a new cache object must read the entry back from disk
+    entry = codetools.FileCache('test', meta={'token': 'foo'}).get_entry('bar')
+    assert entry['value'] == ['baz']
+    assert entry['meta'] == {'token': 'foo', 'url': 'http://example.org'}
+
+    assert codetools.FileCache('test', ttl=0).get('bar') is None
+    assert codetools.FileCache('test', meta={'token': 'quux'}).get('bar') \
+        is None
+
+
+def test_current_timestamp():
+    """Test ISO8601 Zulu timestamp format"""
+    timestamp = codetools.current_timestamp()
+    assert re.match(r'^\d{4}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}Z$', timestamp)
+
+
 def test_debug_lvl_from_env():
     """fetching default debug level from DM_SQUARE_DEBUG env var"""
 
@@ -54,3 +54,48 @@ def test_b3504(b3504):
         '3609236c8b3caebe32fc9b619541bb650e33f4f1'
     assert products['skymap']['eups_version'] == '14.0-4-g3609236+6'
     assert products['skymap']['dependencies'] == ['numpy', 'afw', 'healpy']
+
+
+@responses.activate
+def test_b3504_cached(b3504):
+    responses.add(
+        responses.Response(
+            method='GET',
+            url='https://raw.githubusercontent.com/lsst/versiondb'
+                '/master/manifests/b3504.txt',
+            body=b3504,
+        ),
+    )
+    products = versiondb.Manifest(name='b3504').products
+
+    # a second fetch should be served from the on-disk cache
+    responses.reset()
+    assert versiondb.Manifest(name='b3504').products == products
+
+
+@responses.activate
+def test_b3504_cache_version(b3504, monkeypatch):
+    url = 'https://raw.githubusercontent.com/lsst/versiondb' \
+        '/master/manifests/b3504.txt'
+    responses.add(responses.Response(method='GET', url=url, body=b3504))
+    versiondb.Manifest(name='b3504').products
+
+    # entries from another version of the parser must not be used
+    monkeypatch.setattr(versiondb, 'manifest_cache_version', -1)
+    versiondb.Manifest(name='b3504').products
+    assert len(responses.calls) == 2
+
+
+@responses.activate
+def test_b3504_custom_base_url_not_cached(b3504):
+    base_url = 'https://example.org/manifests'
+    responses.add(
+        responses.Response(
+            method='GET',
+            url=base_url + '/b3504.txt',
+            body=b3504,
+        ),
+    )
+    versiondb.Manifest(name='b3504', base_url=base_url).products
+    versiondb.Manifest(name='b3504', base_url=base_url).products
+    assert len(responses.calls) == 2